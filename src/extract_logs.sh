@@ -0,0 +1,25 @@
+#!/usr/bin/env bash
+# Extract several dates with one main.py --serve process, so Python startup,
+# the mmap and any existing day index are paid once per call instead of once
+# per date. Nothing persists between calls; run main.py --build-index to keep
+# a day index on disk for later queries.
+#
+#   ./extract_logs.sh [--input PATH] [--unsorted] DATE [DATE...]
+set -euo pipefail
+
+args=()
+dates=()
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --input) args+=("$1" "${2:?--input expects a file path}"); shift 2 ;;
+        -*) args+=("$1"); shift ;;
+        *) dates+=("$1"); shift ;;
+    esac
+done
+
+if [ ${#dates[@]} -eq 0 ]; then
+    echo "usage: $0 [--input PATH] [--unsorted] DATE [DATE...]" >&2
+    exit 1
+fi
+
+printf '%s\n' "${dates[@]}" | python3 "$(dirname "$0")/main.py" --serve ${args[@]+"${args[@]}"}
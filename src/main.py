@@ -1,33 +1,262 @@
 import sys
 import os
 import mmap
+import bisect
+import struct
 from datetime import datetime
-import argparse
-from typing import Optional, Tuple
-import logging
-import requests
-from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple
 
-class LogRetriever:
-    def __init__(self, filename: str):
-        """Initialize the log retriever with the input file path."""
-        self.filename = filename
-        self.setup_logging()
-        
-    def setup_logging(self):
-        """Set up logging configuration."""
+USAGE = """usage: main.py DATE [--input PATH] [--build-index] [--check] [--unsorted]
+       main.py --serve [--input PATH] [--check] [--unsorted]
+
+Extract logs for a specific date from a large log file.
+
+  DATE           Target date in YYYY-MM-DD format
+  --input PATH   Input log file path (default: test_logs.log)
+  --build-index  Build the <input>.idx day index so repeated queries skip the bisection
+  --check        Validate the input file format before extracting
+  --unsorted     Scan the whole file instead of bisecting; for logs not ordered by time
+  --serve        Keep the file mapped and answer one date per stdin line with OK or FAIL"""
+
+# A 10-byte date prefix read as two big-endian integers
+DATE_PREFIX = struct.Struct('>QH')
+# Sidecar index record: a date prefix and the offset of its first line
+INDEX_RECORD = struct.Struct('<10sQ')
+# Index date marking where dated lines stop, e.g. at a blank or partial tail
+INDEX_END = b'\xff' * 10
+# Index-build chunks start on this boundary; probes read this much per pread
+INDEX_CHUNK_ALIGN = 128 * 1024
+PROBE_SIZE = 4096
+# Bisection windows this small are read with one pread and probed in memory
+SCAN_BLOCK = 64 * 1024
+# Slice size for the write fallback when sendfile is unavailable
+COPY_CHUNK = 4 * 1024 * 1024
+
+def _logging():
+    """Import and configure logging on first use, keeping it off the startup path."""
+    import logging
+    if not logging.root.handlers:
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
+    return logging
+
+def _bisect(mm: mmap.mmap, key: bytes, after: bool = False) -> int:
+    """
+    Return the offset of the first line whose date prefix is >= key, or
+    > key when `after` is set. A line with fewer than 10 bytes before its
+    newline (blank, or partially written at EOF) sorts after every key, so
+    a ragged tail never lands inside a day.
+    Relies on the log lines being sorted by timestamp.
+    """
+    size = len(mm)
+
+    # A YYYY-MM-DD prefix compares as big-endian integers exactly as it does
+    # as bytes, so probes unpack in place instead of slicing
+    key_ints = DATE_PREFIX.unpack(key)
+
+    def below(pos: int) -> bool:
+        if pos + 10 > size or mm.find(b'\n', pos, pos + 10) != -1:
+            return False
+        prefix = DATE_PREFIX.unpack_from(mm, pos)
+        return prefix <= key_ints if after else prefix < key_ints
+
+    if not below(0):
+        return 0
+
+    # Invariant: the line start following `lo` is the answer once lo == hi.
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        nl = mm.find(b'\n', mid)
+        if nl != -1 and below(nl + 1):
+            lo = mid + 1
+        else:
+            hi = mid
 
-    def validate_file_content(self) -> bool:
+    nl = mm.find(b'\n', lo)
+    return size if nl == -1 else nl + 1
+
+def _pread_probe(fd: int, pos: int, size: int) -> Tuple[int, bytes]:
+    """
+    Return the first line start after `pos` and that line's date prefix,
+    reading with pread so the probe does not depend on a shared file position.
+    """
+    while pos < size:
+        buf = os.pread(fd, PROBE_SIZE, pos)
+        nl = buf.find(b'\n')
+        if nl == -1:
+            pos += len(buf)
+            continue
+        start = pos + nl + 1
+        prefix = buf[nl + 1:nl + 11]
+        if len(prefix) < 10 and start < size:
+            prefix = os.pread(fd, 10, start)
+        return start, prefix
+    return size, b''
+
+def _full_prefix(prefix: bytes) -> bool:
+    """Return True if a probed prefix holds 10 bytes of a single line."""
+    return len(prefix) == 10 and b'\n' not in prefix
+
+def _scan_chunk(filename: str, start: int, end: int, size: int) -> List[Tuple[bytes, int]]:
+    """
+    Return (date, offset) for every day boundary among the lines starting
+    in [start, end), beginning with the chunk's first complete line.
+    """
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        entries: List[Tuple[bytes, int]] = []
+        if start == 0:
+            pos, date = 0, os.pread(fd, 10, 0)
+        else:
+            pos, date = _pread_probe(fd, start - 1, size)
+
+        while pos < end:
+            if not _full_prefix(date):
+                # Short lines sort after every date (as in _bisect), so the index stops here
+                entries.append((INDEX_END, pos))
+                break
+            entries.append((date, pos))
+
+            # Bisect for the first line whose prefix sorts above `date`.
+            # Once the window fits in one block, read it whole and finish
+            # the remaining probes in memory instead of a pread each.
+            key = date + b'\xff'
+            lo, hi = pos, end
+            block, base = b'', 0
+            while True:
+                if not block and hi - lo <= SCAN_BLOCK:
+                    block, base = os.pread(fd, hi - lo + PROBE_SIZE, lo), lo
+                mid = (lo + hi) // 2 if lo < hi else lo
+                nl = block.find(b'\n', mid - base) if block else -1
+                if nl != -1 and nl + 11 <= len(block):
+                    line_start, prefix = base + nl + 1, block[nl + 1:nl + 11]
+                else:
+                    line_start, prefix = _pread_probe(fd, mid, size)
+                if lo == hi:
+                    break
+                if line_start < size and _full_prefix(prefix) and prefix < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            pos, date = line_start, prefix
+        return entries
+    finally:
+        os.close(fd)
+
+def _scan_day(mm: mmap.mmap, key: bytes) -> Iterator[Tuple[int, int]]:
+    """
+    Yield the [start, end) ranges of lines whose date prefix is key, for
+    logs that are not sorted. Matching lines are located with a C-level
+    substring search for b'\\n' + key, so non-matching lines never reach
+    Python; runs of adjacent matching lines are merged into one range.
+    """
+    size = len(mm)
+    needle = b'\n' + key
+    if mm[:len(key)] == key:
+        start = 0
+    else:
+        nl = mm.find(needle)
+        start = size if nl == -1 else nl + 1
+
+    while start < size:
+        end = start
+        while end < size and mm[end:end + len(key)] == key:
+            nl = mm.find(b'\n', end)
+            end = size if nl == -1 else nl + 1
+        yield start, end
+
+        nl = mm.find(needle, end - 1)
+        start = size if nl == -1 else nl + 1
+
+def _valid_date(date: str) -> bool:
+    """
+    Return True if date is a real calendar date in zero-padded YYYY-MM-DD
+    form; strptime alone also accepts unpadded dates such as 2024-1-5.
+    """
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d') == date
+    except ValueError:
+        return False
+
+def _output_file(date: str) -> str:
+    """Return the output path for a date's extracted logs."""
+    return f"output/output_{date}.txt"
+
+def _advise(mm: mmap.mmap, *advice_names: str, start: int = 0, end: Optional[int] = None):
+    """
+    Hint the kernel about the access pattern for [start, end) of the mapping.
+    Advice values the platform does not support are skipped.
+    """
+    if not hasattr(mm, 'madvise'):
+        return
+    end = len(mm) if end is None else end
+    aligned = start & ~(mmap.PAGESIZE - 1)
+    for name in advice_names:
+        advice = getattr(mmap, name, None)
+        if advice is not None:
+            mm.madvise(advice, aligned, end - aligned)
+
+def _copy_range(mm: mmap.mmap, src_fd: int, out_fd: int, start: int, end: int):
+    """
+    Copy bytes [start, end) of the source file to out_fd.
+    On Linux this uses sendfile so the data goes page cache to page cache
+    without passing through user space; otherwise the mapping is written
+    straight to the descriptor in COPY_CHUNK slices.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            while start < end:
+                sent = os.sendfile(out_fd, src_fd, start, end - start)
+                if sent == 0:
+                    return
+                start += sent
+            return
+        except OSError:
+            # Some filesystems reject sendfile; finish the copy with plain writes
+            pass
+
+    while start < end:
+        start += os.write(out_fd, mm[start:min(start + COPY_CHUNK, end)])
+
+def _drop_cache(fd: int, start: int, end: int):
+    """
+    Tell the kernel the cached pages holding [start, end) are no longer
+    needed, so a large extraction does not evict other processes' working
+    sets. The hint is advisory, so failures are ignored.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    start &= ~(mmap.PAGESIZE - 1)
+    end = -(-end // mmap.PAGESIZE) * mmap.PAGESIZE
+    try:
+        os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+class LogRetriever:
+    def __init__(self, filename: str, sorted_logs: bool = True):
+        """
+        Initialize the log retriever with the input file path.
+        Pass sorted_logs=False if the file is not ordered by timestamp.
+        """
+        self.filename = filename
+        self.sorted_logs = sorted_logs
+        self.index_filename = f"{filename}.idx"
+        self.index: Optional[Tuple[List[bytes], List[int]]] = None
+        self.file = None
+        self.mm: Optional[mmap.mmap] = None
+        self.output_dirs: Set[str] = set()
+
+    def validate(self) -> bool:
         """
         Validate that the file exists and contains proper log content.
         """
         try:
             if not os.path.exists(self.filename):
-                logging.error(f"File {self.filename} does not exist")
+                _logging().error(f"File {self.filename} does not exist")
                 return False
 
             # Read first line to check format
@@ -36,8 +265,8 @@ class LogRetriever:
                 
                 # Check if file contains HTML instead of logs
                 if first_line.startswith('<!DOCTYPE html>') or first_line.startswith('<html'):
-                    logging.error("File appears to be HTML instead of log content.")
-                    logging.error("Please download the actual log file and try again.")
+                    _logging().error("File appears to be HTML instead of log content.")
+                    _logging().error("Please download the actual log file and try again.")
                     return False
                 
                 # Try to parse the first line as a log entry
@@ -46,89 +275,303 @@ class LogRetriever:
                     datetime_str = ' '.join(first_line.split()[:2])
                     datetime.strptime(datetime_str, '%Y-%m-%d %H:%M:%S')
                 except ValueError:
-                    logging.error("File does not appear to contain properly formatted logs")
-                    logging.error("Expected format: YYYY-MM-DD HH:MM:SS LEVEL MESSAGE")
+                    _logging().error("File does not appear to contain properly formatted logs")
+                    _logging().error("Expected format: YYYY-MM-DD HH:MM:SS LEVEL MESSAGE")
                     return False
                     
             return True
 
         except Exception as e:
-            logging.error(f"Error validating file: {e}")
+            _logging().error(f"Error validating file: {e}")
             return False
 
-    def create_sample_data(self, target_date: str):
+    def build_index(self) -> bool:
         """
-        Create sample log data for testing purposes.
+        Record where each day starts and persist it as a sidecar index.
+        Returns True if successful, False otherwise.
         """
-        logging.info("Creating sample log data for testing...")
-        
-        sample_logs = f"""{target_date} 10:00:00 INFO User login successful
-{target_date} 10:01:23 DEBUG Cache update completed
-{target_date} 10:05:45 INFO Database connection established
-{target_date} 10:10:12 WARN High memory usage detected
-{target_date} 10:15:00 ERROR Failed to process request
-"""
-        
-        with open(self.filename, 'w') as f:
-            f.write(sample_logs)
-            
-        logging.info(f"Sample log data created in {self.filename}")
-        
+        from concurrent.futures import ThreadPoolExecutor
+
+        try:
+            size = os.path.getsize(self.filename)
+            workers = os.cpu_count() or 1
+            # One chunk per worker, each starting on an aligned boundary
+            chunk = -(-size // workers)
+            chunk = max(INDEX_CHUNK_ALIGN, -(-chunk // INDEX_CHUNK_ALIGN) * INDEX_CHUNK_ALIGN)
+            bounds = [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+
+            with ThreadPoolExecutor(max_workers=max(1, len(bounds))) as pool:
+                results = pool.map(lambda b: _scan_chunk(self.filename, b[0], b[1], size), bounds)
+
+                # Each chunk restarts with its first line's date; drop the repeats at the
+                # seams, and keep nothing after the first INDEX_END so dates stay sorted
+                dates: List[bytes] = []
+                offsets: List[int] = []
+                for date, offset in (entry for entries in results for entry in entries):
+                    if dates and dates[-1] == INDEX_END:
+                        break
+                    if not dates or dates[-1] != date:
+                        dates.append(date)
+                        offsets.append(offset)
+
+            tmp_filename = f"{self.index_filename}.tmp"
+            with open(tmp_filename, 'wb') as idx_f:
+                for date, offset in zip(dates, offsets):
+                    idx_f.write(INDEX_RECORD.pack(date, offset))
+            os.replace(tmp_filename, self.index_filename)
+
+            self.index = (dates, offsets)
+            days = len(dates) - (INDEX_END in dates)
+            _logging().info(f"Indexed {days} days into {self.index_filename}")
+            return True
+
+        except Exception as e:
+            _logging().error(f"Error building index: {e}")
+            return False
+
+    def load_index(self) -> bool:
+        """
+        Load the sidecar index if it exists and is newer than the log file.
+        Returns True if an index is available, False otherwise.
+        """
+        if self.index is not None:
+            return True
+        try:
+            if os.path.getmtime(self.index_filename) < os.path.getmtime(self.filename):
+                return False
+            with open(self.index_filename, 'rb') as idx_f:
+                records = list(INDEX_RECORD.iter_unpack(idx_f.read()))
+        except (OSError, struct.error):
+            return False
+
+        self.index = ([date for date, _ in records], [offset for _, offset in records])
+        return True
+
+    def lookup_index(self, target_bytes: bytes, size: int) -> Tuple[int, int]:
+        """Return the [start, end) byte range of a day from the loaded index."""
+        dates, offsets = self.index
+        i = bisect.bisect_left(dates, target_bytes)
+        if i == len(dates) or dates[i] != target_bytes:
+            return 0, 0
+        end = offsets[i + 1] if i + 1 < len(offsets) else size
+        return offsets[i], end
+
+    def __enter__(self) -> 'LogRetriever':
+        """Keep the log file and its mapping open across extract_logs calls."""
+        self.open_mapping()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Release the mapping and file opened by __enter__."""
+        self.close_mapping()
+
+    def open_mapping(self):
+        """Open and map the log file; raises OSError if it cannot be read."""
+        self.file = open(self.filename, 'rb')
+        try:
+            if os.fstat(self.file.fileno()).st_size > 0:
+                self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            self.file.close()
+            self.file = None
+            raise
+
+    def close_mapping(self):
+        """Release the mapping and file opened by open_mapping."""
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self.file.close()
+        self.file = None
+
     def extract_logs(self, target_date: str, output_file: str) -> bool:
         """
         Extract logs for the target date and save to output file.
+        Reuses the open mapping when called inside a `with` block.
         Returns True if successful, False otherwise.
         """
         try:
-            # Validate file content
-            if not self.validate_file_content():
-                # For testing purposes, create sample data
-                self.create_sample_data(target_date)
-                
-            # Create output directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            # Create output directory if it doesn't exist, checking each directory once
+            out_dir = os.path.dirname(output_file)
+            if out_dir not in self.output_dirs:
+                if out_dir and not os.path.isdir(out_dir):
+                    os.makedirs(out_dir, exist_ok=True)
+                self.output_dirs.add(out_dir)
             
-            found_logs = False
-            with open(self.filename, 'r') as f, open(output_file, 'w') as out_f:
-                for line in f:
-                    if line.startswith(target_date):
-                        out_f.write(line)
-                        found_logs = True
+            if self.mm is not None:
+                found_logs, (start_pos, end_pos) = self._extract_mapped(
+                    self.file.fileno(), self.mm, target_date, output_file)
+
+                # Mapped pages are not evicted, so unmap this query's span first
+                if end_pos > start_pos:
+                    _advise(self.mm, 'MADV_DONTNEED', start=start_pos, end=end_pos)
+                    _drop_cache(self.file.fileno(), start_pos, end_pos)
+            else:
+                with open(self.filename, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        _logging().warning(f"No logs found for date {target_date}")
+                        return False
+
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        found_logs, (start_pos, end_pos) = self._extract_mapped(
+                            f.fileno(), mm, target_date, output_file)
+
+                    # Pages are only released once unmapped, so this follows mm.close()
+                    if end_pos > start_pos:
+                        _drop_cache(f.fileno(), start_pos, end_pos)
             
             if not found_logs:
-                logging.warning(f"No logs found for date {target_date}")
+                _logging().warning(f"No logs found for date {target_date}")
                 return False
-                
-            logging.info(f"Logs extracted to {output_file}")
+
             return True
                 
         except Exception as e:
-            logging.error(f"Error extracting logs: {e}")
+            _logging().error(f"Error extracting logs: {e}")
+            return False
+
+    def _extract_mapped(self, fd: int, mm: mmap.mmap, target_date: str,
+                        output_file: str) -> Tuple[bool, Tuple[int, int]]:
+        """
+        Write the target date's lines from an open mapping to output_file.
+        Returns whether any lines were found, and the [start, end) span of
+        the file the query read: the copied day for sorted logs, or the whole
+        file for the unsorted scan.
+        """
+        target_bytes = target_date.encode('ascii')
+        if not self.sorted_logs:
+            _advise(mm, 'MADV_SEQUENTIAL')
+            ranges = _scan_day(mm, target_bytes)
+            span = (0, len(mm))
+        else:
+            if self.load_index():
+                start_pos, end_pos = self.lookup_index(target_bytes, len(mm))
+            else:
+                # Bisection probes touch scattered single pages, so disable readahead
+                _advise(mm, 'MADV_RANDOM')
+
+                # Bracket the day with two bisections: [first >= date, first > date)
+                start_pos = _bisect(mm, target_bytes)
+                end_pos = _bisect(mm, target_bytes, after=True)
+
+            # Sorted logs make [start_pos, end_pos) exactly the target day, so copy it in bulk
+            ranges = []
+            if end_pos > start_pos:
+                _advise(mm, 'MADV_SEQUENTIAL', 'MADV_WILLNEED', start=start_pos, end=end_pos)
+                ranges.append((start_pos, end_pos))
+            span = (start_pos, end_pos)
+
+        found_logs = False
+        out_fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            for start_pos, end_pos in ranges:
+                _copy_range(mm, fd, out_fd, start_pos, end_pos)
+                found_logs = True
+        finally:
+            os.close(out_fd)
+        return found_logs, span
+
+    def serve(self) -> bool:
+        """
+        Answer one YYYY-MM-DD date per stdin line from a single open mapping,
+        writing each to its output file and printing OK or FAIL per query.
+        Returns False if the log file cannot be opened, True otherwise.
+        """
+        try:
+            self.open_mapping()
+        except OSError as e:
+            _logging().error(f"Error opening log file: {e}")
             return False
 
+        try:
+            for line in sys.stdin:
+                date = line.strip()
+                if not date:
+                    continue
+                if _valid_date(date) and self.extract_logs(date, _output_file(date)):
+                    print("OK", flush=True)
+                else:
+                    print("FAIL", flush=True)
+            return True
+        finally:
+            self.close_mapping()
+
+def _usage_error(message: str):
+    """Print the usage text with an error message and exit."""
+    print(USAGE)
+    print(f"Error: {message}")
+    sys.exit(1)
+
+class Options(NamedTuple):
+    date: Optional[str] = None
+    input_file: str = 'test_logs.log'
+    build_index: bool = False
+    check: bool = False
+    unsorted: bool = False
+    serve: bool = False
+
+def parse_args(argv: List[str]) -> Options:
+    """
+    Parse the command line described in USAGE.
+    Hand-rolled because importing argparse costs more than an indexed query.
+    """
+    date, options = None, {}
+    args = iter(argv)
+    for arg in args:
+        if arg in ('-h', '--help'):
+            print(USAGE)
+            sys.exit(0)
+        elif arg == '--input':
+            options['input_file'] = next(args, None)
+            if options['input_file'] is None:
+                _usage_error("--input expects a file path")
+        elif arg.startswith('--input='):
+            options['input_file'] = arg[len('--input='):]
+        elif arg == '--build-index':
+            options['build_index'] = True
+        elif arg == '--check':
+            options['check'] = True
+        elif arg == '--unsorted':
+            options['unsorted'] = True
+        elif arg == '--serve':
+            options['serve'] = True
+        elif date is None and not arg.startswith('-'):
+            date = arg
+        else:
+            _usage_error(f"Unrecognized argument {arg}")
+
+    if date is None and not options.get('serve'):
+        _usage_error("Missing target date")
+    if options.get('build_index') and options.get('unsorted'):
+        _usage_error("--build-index requires logs sorted by time")
+    return Options(date, **options)
+
 def main():
-    parser = argparse.ArgumentParser(
-        description='Extract logs for a specific date from a large log file.',
-        formatter_class=argparse.RawTextHelpFormatter
-    )
-    parser.add_argument('date', type=str, help='Target date in YYYY-MM-DD format')
-    parser.add_argument('--input', type=str, default='test_logs.log', help='Input log file path')
-    
-    args = parser.parse_args()
-    
+    options = parse_args(sys.argv[1:])
+    retriever = LogRetriever(options.input_file, sorted_logs=not options.unsorted)
+    if options.check and not retriever.validate():
+        print("Error: Input file failed validation")
+        sys.exit(1)
+
+    if options.serve:
+        if not retriever.serve():
+            print("Failed to extract logs")
+            sys.exit(1)
+        return
+
     # Validate date format
-    try:
-        datetime.strptime(args.date, '%Y-%m-%d')
-    except ValueError:
+    date = options.date
+    if not _valid_date(date):
         print("Error: Invalid date format. Please use YYYY-MM-DD")
         sys.exit(1)
         
     # Set up output file path
-    output_file = f"output/output_{args.date}.txt"
+    output_file = _output_file(date)
     
     # Create and run the log retriever
-    retriever = LogRetriever(args.input)
-    if retriever.extract_logs(args.date, output_file):
+    if options.build_index and not retriever.load_index():
+        retriever.build_index()
+    if retriever.extract_logs(date, output_file):
         print(f"Successfully extracted logs to {output_file}")
     else:
         print("Failed to extract logs")
@@ -0,0 +1,138 @@
+import os
+import random
+
+import pytest
+
+import main
+
+
+def expected_lines(data: bytes, date: str) -> bytes:
+    """Brute-force reference: every line that starts with the date."""
+    return b''.join(line for line in data.splitlines(True) if line.startswith(date.encode()))
+
+
+def write_log(tmp_path, data: bytes) -> str:
+    """Write data as the test log file and return its path."""
+    log_file = tmp_path / 'test.log'
+    log_file.write_bytes(data)
+    return str(log_file)
+
+
+def extract(log_file: str, date: str, **retriever_args) -> bytes:
+    """Extract one date from the log file and return the output bytes."""
+    output_file = os.path.join(os.path.dirname(log_file), 'output', f'output_{date}.txt')
+    main.LogRetriever(log_file, **retriever_args).extract_logs(date, output_file)
+    with open(output_file, 'rb') as f:
+        return f.read()
+
+
+def sorted_log(rng: random.Random, days: int) -> bytes:
+    """Build a sorted log with a random number of lines per day."""
+    lines = []
+    for day in range(1, days + 1):
+        for i in range(rng.randint(0, 6)):
+            lines.append(f"2024-01-{day:02d} 10:00:{i:02d} INFO {'x' * rng.randint(0, 40)}\n")
+    return ''.join(lines).encode()
+
+
+def test_trailing_blank_line(tmp_path):
+    log_file = write_log(tmp_path, b'2024-01-01\n2024-01-02 a\n\n')
+    assert extract(log_file, '2024-01-01') == b'2024-01-01\n'
+    assert extract(log_file, '2024-01-02') == b'2024-01-02 a\n'
+
+
+def test_truncated_last_line(tmp_path):
+    log_file = write_log(tmp_path, b'2024-01-01 x\n2024-01-0')
+    assert extract(log_file, '2024-01-01') == b'2024-01-01 x\n'
+
+
+def test_last_possible_date(tmp_path):
+    log_file = write_log(tmp_path, b'2024-01-01 x\n9999-12-31 y\n')
+    assert extract(log_file, '9999-12-31') == b'9999-12-31 y\n'
+
+
+@pytest.mark.parametrize('tail', [b'', b'\n', b'\n\n', b'2024-01-0', b'2024-01-09 no newline', b'\n2024'])
+def test_bisection_matches_brute_force(tmp_path, tail):
+    rng = random.Random(len(tail))
+    for _ in range(20):
+        data = sorted_log(rng, 8) + tail
+        log_file = write_log(tmp_path, data)
+        for day in range(0, 10):
+            date = f"2024-01-{day:02d}"
+            assert extract(log_file, date) == expected_lines(data, date)
+
+
+@pytest.mark.parametrize('chunk_align', [1, 7, 4096])
+def test_index_with_trailing_blank_line(tmp_path, monkeypatch, chunk_align):
+    monkeypatch.setattr(main, 'INDEX_CHUNK_ALIGN', chunk_align)
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 4)
+    data = b'2024-01-01\n2024-01-02 a\n\n'
+    log_file = write_log(tmp_path, data)
+    assert main.LogRetriever(log_file).build_index()
+    assert main.LogRetriever(log_file).load_index()
+
+    for date in ('2024-01-01', '2024-01-02'):
+        assert extract(log_file, date) == expected_lines(data, date)
+
+
+@pytest.mark.parametrize('chunk_align', [1, 7, 300, 4096, 1 << 20])
+@pytest.mark.parametrize('scan_block', [0, 64, 1024, 64 * 1024])
+def test_index_matches_brute_force(tmp_path, monkeypatch, chunk_align, scan_block):
+    monkeypatch.setattr(main, 'INDEX_CHUNK_ALIGN', chunk_align)
+    monkeypatch.setattr(main, 'SCAN_BLOCK', scan_block)
+    monkeypatch.setattr(main.os, 'cpu_count', lambda: 8)
+    rng = random.Random(chunk_align + scan_block)
+    for tail in (b'', b'\n', b'2024-01-1'):
+        data = sorted_log(rng, 12) + tail
+        log_file = write_log(tmp_path, data)
+        retriever = main.LogRetriever(log_file)
+        assert retriever.build_index()
+        assert main.LogRetriever(log_file).load_index()
+
+        # One entry per day present, in order, with no duplicates at chunk seams
+        days = sorted({line[:10] for line in data.splitlines() if len(line) >= 10})
+        assert [d for d in retriever.index[0] if d != main.INDEX_END] == days
+
+        for day in range(0, 14):
+            date = f"2024-01-{day:02d}"
+            assert extract(log_file, date) == expected_lines(data, date)
+
+
+def test_index_lookup(tmp_path):
+    data = b'2024-01-01 a\n2024-01-01 b\n2024-01-03 c\n2024-01-04 d\n'
+    log_file = write_log(tmp_path, data)
+    retriever = main.LogRetriever(log_file)
+    assert retriever.build_index()
+
+    assert retriever.lookup_index(b'2024-01-01', len(data)) == (0, 26)
+    # The last day runs to EOF
+    assert retriever.lookup_index(b'2024-01-04', len(data)) == (39, len(data))
+    # Misses before, between and after the indexed days
+    for date in (b'2023-12-31', b'2024-01-02', b'2024-01-05'):
+        assert retriever.lookup_index(date, len(data)) == (0, 0)
+
+
+def test_stale_index_is_ignored(tmp_path):
+    log_file = write_log(tmp_path, b'2024-01-01 a\n')
+    assert main.LogRetriever(log_file).build_index()
+    assert main.LogRetriever(log_file).load_index()
+
+    # Rewriting the log leaves the index older than the log file
+    index_mtime = os.path.getmtime(f"{log_file}.idx")
+    data = b'2024-01-01 a\n2024-01-02 b\n'
+    write_log(tmp_path, data)
+    os.utime(log_file, (index_mtime + 10, index_mtime + 10))
+    assert not main.LogRetriever(log_file).load_index()
+    assert extract(log_file, '2024-01-02') == b'2024-01-02 b\n'
+
+
+def test_unsorted_scan_matches_brute_force(tmp_path):
+    rng = random.Random(0)
+    lines = sorted_log(rng, 9).splitlines(True)
+    rng.shuffle(lines)
+    for tail in (b'', b'\n', b'2024-01-05 no newline'):
+        data = b''.join(lines) + tail
+        log_file = write_log(tmp_path, data)
+        for day in range(0, 11):
+            date = f"2024-01-{day:02d}"
+            assert extract(log_file, date, sorted_logs=False) == expected_lines(data, date)